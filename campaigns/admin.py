@@ -1,4 +1,7 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
+from django.core.paginator import Paginator
+from django.forms.models import BaseInlineFormSet
 from .models import Campaign, CampaignBudget, CampaignUsageDaily
 
 
@@ -9,12 +12,56 @@ class CampaignBudgetInline(admin.StackedInline):
     readonly_fields = ("total_discount_given", "created_at", "updated_at")
 
 
-class CampaignUsageDailyInline(admin.TabularInline):
+class PaginatedInlineFormSet(BaseInlineFormSet):
+    """Inline formset that only builds forms for one page of related rows."""
+    request = None
+    per_page = 20
+    page_param = "page"
+
+    def get_queryset(self):
+        if not hasattr(self, "_queryset"):
+            paginator = Paginator(super().get_queryset(), self.per_page)
+            self.page = paginator.get_page(self.request.GET.get(self.page_param) if self.request else None)
+            self._queryset = self.page.object_list
+        return self._queryset
+
+
+class PaginatedTabularInline(admin.TabularInline):
+    """TabularInline rendering `per_page` rows, selected by the `page_param` query param."""
+    per_page = 20
+    page_param = "page"
+    template = "admin/campaigns/paginated_tabular.html"
+
+    def get_formset(self, request, obj=None, **kwargs):
+        formset = super().get_formset(request, obj, **kwargs)
+        return type(
+            formset.__name__,
+            (PaginatedInlineFormSet, formset),
+            {"request": request, "per_page": self.per_page, "page_param": self.page_param},
+        )
+
+
+class CampaignUsageDailyInline(PaginatedTabularInline):
     model = CampaignUsageDaily
     extra = 0
     can_delete = False
+    show_change_link = False
+    per_page = 20
+    page_param = "usage_page"
     readonly_fields = ("usage_date", "customer", "txn_count", "created_at", "updated_at")
     ordering = ("-usage_date",)
+    raw_id_fields = ("customer",)
+
+    def get_queryset(self, request):
+        # __str__ (rendered per row) reads campaign.name
+        return super().get_queryset(request).select_related("campaign", "customer")
+
+
+class CampaignChangeList(ChangeList):
+    """The changelist never shows description; the change form still loads it."""
+
+    def get_queryset(self, request, exclude_parameters=None):
+        return super().get_queryset(request, exclude_parameters).defer("description")
 
 
 @admin.register(Campaign)
@@ -42,6 +89,7 @@ class CampaignAdmin(admin.ModelAdmin):
     )
     search_fields = ("name", "description")
     ordering = ("-created_at",)
+    show_full_result_count = False
     filter_horizontal = ("specific_customers",)
     inlines = [CampaignBudgetInline, CampaignUsageDailyInline]
 
@@ -67,6 +115,13 @@ class CampaignAdmin(admin.ModelAdmin):
         ("Status", {"fields": ("is_active",)}),
     )
 
+    def get_queryset(self, request):
+        # remaining_budget reads the reverse one-to-one; fetch it in the same JOIN.
+        return super().get_queryset(request).select_related("budget")
+
+    def get_changelist(self, request, **kwargs):
+        return CampaignChangeList
+
     # computed columns
     @admin.display(description="Remaining Budget")
     def remaining_budget_display(self, obj: Campaign):
@@ -83,14 +138,19 @@ class CampaignAdmin(admin.ModelAdmin):
 @admin.register(CampaignBudget)
 class CampaignBudgetAdmin(admin.ModelAdmin):
     list_display = ("campaign", "total_discount_given", "created_at", "updated_at")
+    list_select_related = ("campaign",)
     search_fields = ("campaign__name",)
+    show_full_result_count = False
     readonly_fields = ("created_at", "updated_at")
 
 
 @admin.register(CampaignUsageDaily)
 class CampaignUsageDailyAdmin(admin.ModelAdmin):
     list_display = ("campaign", "customer", "usage_date", "txn_count", "created_at")
+    list_select_related = ("campaign", "customer")
     list_filter = ("usage_date", "campaign")
     search_fields = ("campaign__name", "customer__username")
     readonly_fields = ("created_at", "updated_at")
     ordering = ("-usage_date",)
+    list_per_page = 50
+    show_full_result_count = False
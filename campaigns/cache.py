@@ -0,0 +1,54 @@
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Campaign
+
+# seconds an /available/ response (and the active count) is reused; bounds
+# staleness when another process changes campaigns or signals are bypassed
+AVAILABLE_CACHE_TIMEOUT = 30
+
+# Version stamp of campaign data; part of every cached /available/ key, so
+# bumping it invalidates all cached responses at once.
+EPOCH_KEY = "campaign_epoch"
+# Number of is_active campaigns; lets /available/ skip all work on an empty catalog.
+ACTIVE_COUNT_KEY = "campaigns:active_count"
+
+
+def campaign_epoch() -> int:
+    return cache.get_or_set(EPOCH_KEY, time.time_ns(), timeout=None)
+
+
+def _bump() -> None:
+    try:
+        cache.incr(EPOCH_KEY)
+    except ValueError:  # key missing or evicted
+        cache.set(EPOCH_KEY, time.time_ns(), timeout=None)
+
+
+def bump_campaign_epoch() -> None:
+    """
+    Invalidate cached /available/ responses. Bumps now (for readers in this
+    transaction) and again on commit (for responses cached in between).
+    """
+    _bump()
+    transaction.on_commit(_bump)
+
+
+def active_campaign_count() -> int:
+    return cache.get_or_set(
+        ACTIVE_COUNT_KEY,
+        lambda: Campaign.objects.filter(is_active=True).count(),
+        timeout=AVAILABLE_CACHE_TIMEOUT,
+    )
+
+
+def _forget_active_count() -> None:
+    cache.delete(ACTIVE_COUNT_KEY)
+
+
+def forget_active_campaign_count() -> None:
+    """Drop the cached active count now and on commit, like bump_campaign_epoch()."""
+    _forget_active_count()
+    transaction.on_commit(_forget_active_count)
@@ -1,15 +1,18 @@
 from django.core.management.base import BaseCommand
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import User
+from django.db import connection, transaction
 from django.utils import timezone
 from datetime import timedelta
 from decimal import Decimal
-from random import randint, choice
+from random import choices
 
+from campaigns.cache import bump_campaign_epoch, forget_active_campaign_count
 from campaigns.models import Campaign, CampaignBudget, CampaignUsageDaily
 
 
 class Command(BaseCommand):
-    help = "Seed ~50 campaigns + 2 test users for development/testing."
+    help = "Seed 3 fixed + --count random campaigns (default 47) + 2 test users for development/testing."
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -22,27 +25,44 @@ class Command(BaseCommand):
             action="store_true",
             help="Do not create test users (only campaigns)",
         )
+        parser.add_argument(
+            "--count",
+            type=int,
+            default=47,
+            help="Number of random campaigns to generate (default 47, i.e. 50 in total)",
+        )
 
     def handle(self, *args, **opts):
         fresh: bool = opts["fresh"]
         no_users: bool = opts["no_users"]
+        count: int = opts["count"]
 
         # ---------------- CLEAN OLD DATA ----------------
         if fresh:
             self.stdout.write(self.style.WARNING("Cleaning old campaign data…"))
-            CampaignBudget.objects.all().delete()
-            CampaignUsageDaily.objects.all().delete()
-            Campaign.objects.all().delete()
+            if connection.vendor == "postgresql":
+                # one statement, independent of table size; CASCADE covers the M2M table
+                tables = ", ".join(
+                    connection.ops.quote_name(m._meta.db_table)
+                    for m in (CampaignBudget, CampaignUsageDaily, Campaign)
+                )
+                with connection.cursor() as cur:
+                    cur.execute(f"TRUNCATE {tables} RESTART IDENTITY CASCADE")
+            else:
+                CampaignBudget.objects.all().delete()
+                CampaignUsageDaily.objects.all().delete()
+                Campaign.objects.all().delete()
 
         # ---------------- USERS ----------------
         users = []
         if not no_users:
-            for username in ("customer1", "customer2"):
-                u, created = User.objects.get_or_create(username=username)
-                if created:
-                    u.set_password("pass1234")
-                    u.save()
-                users.append(u)
+            names = ("customer1", "customer2")
+            existing = set(User.objects.filter(username__in=names).values_list("username", flat=True))
+            password = make_password("pass1234")
+            User.objects.bulk_create(
+                [User(username=n, password=password) for n in names if n not in existing]
+            )
+            users = list(User.objects.filter(username__in=names).order_by("username"))
 
             self.stdout.write(
                 self.style.SUCCESS(f"Ensured {len(users)} test users (password: pass1234)")
@@ -54,7 +74,7 @@ class Command(BaseCommand):
 
         # ---------------- 3 DETERMINISTIC CAMPAIGNS ----------------
         deterministic_campaigns = [
-            Campaign.objects.create(
+            Campaign(
                 name="Cart 10% OFF",
                 description="10% discount on cart subtotal for all customers.",
                 applies_to="CART",
@@ -69,7 +89,7 @@ class Command(BaseCommand):
                 max_txn_per_customer_per_day=2,
                 is_active=True,
             ),
-            Campaign.objects.create(
+            Campaign(
                 name="Delivery FLAT 50",
                 description="Flat 50 discount on delivery charges.",
                 applies_to="DELIVERY",
@@ -84,7 +104,7 @@ class Command(BaseCommand):
                 max_txn_per_customer_per_day=3,
                 is_active=True,
             ),
-            Campaign.objects.create(
+            Campaign(
                 name="Targeted Cart 20%",
                 description="20% discount only for customer1.",
                 applies_to="CART",
@@ -101,43 +121,67 @@ class Command(BaseCommand):
             ),
         ]
 
-        # Targeted campaign → assign specific customer
-        if users:
-            deterministic_campaigns[2].specific_customers.add(users[0])
-            deterministic_campaigns[2].save()
-
-        # ---------------- 47 RANDOM CAMPAIGNS ----------------
+        # ---------------- RANDOM CAMPAIGNS ----------------
+        # Draw each column in one choices() call instead of ~8 random calls per row
         name_chunks = ["Mega", "Super", "Deal", "Fest", "Saver", "Prime", "Ultra", "Smart"]
-        total_created = 3
-
-        for i in range(47):  # total = 3 + 47 = 50
-            name = f"{choice(name_chunks)} Campaign {i+1}"
-
-            applies_to = choice(["CART", "DELIVERY"])
-            discount_type = choice(["PERCENT", "FLAT"])
-
-            if discount_type == "PERCENT":
-                discount_value = Decimal(randint(5, 40))  # 5%–40%
-            else:
-                discount_value = Decimal(randint(20, 200))  # flat 20–200
-
-            camp = Campaign.objects.create(
-                name=name,
+        names = choices(name_chunks, k=count)
+        applies_tos = choices(["CART", "DELIVERY"], k=count)
+        discount_types = choices(["PERCENT", "FLAT"], k=count)
+        percent_values = choices(range(5, 41), k=count)  # 5%–40%
+        flat_values = choices(range(20, 201), k=count)  # flat 20–200
+        max_discounts = choices([100, 150, 200, 300], k=count)
+        start_offsets = choices(range(0, 4), k=count)
+        end_offsets = choices(range(10, 41), k=count)
+        run_days_limits = choices([None, 5, 7, 10], k=count)
+        budget_limits = choices([500, 1000, 2000, 5000], k=count)
+        txn_limits = choices([1, 2, 3], k=count)
+
+        objs = list(deterministic_campaigns)
+        objs.extend(
+            Campaign(
+                name=f"{names[i]} Campaign {i+1}",
                 description="Auto-generated sample campaign",
-                applies_to=applies_to,
-                discount_type=discount_type,
-                discount_value=discount_value,
-                max_discount_amount=Decimal(choice([100, 150, 200, 300])),
+                applies_to=applies_tos[i],
+                discount_type=discount_types[i],
+                discount_value=Decimal(
+                    percent_values[i] if discount_types[i] == "PERCENT" else flat_values[i]
+                ),
+                max_discount_amount=Decimal(max_discounts[i]),
                 allow_all_customers=True,
-                start_date=today - timedelta(days=randint(0, 3)),
-                end_date=today + timedelta(days=randint(10, 40)),
-                run_days_limit=choice([None, 5, 7, 10]),
-                total_budget_limit=Decimal(choice([500, 1000, 2000, 5000])),
-                max_txn_per_customer_per_day=choice([1, 2, 3]),
+                start_date=today - timedelta(days=start_offsets[i]),
+                end_date=today + timedelta(days=end_offsets[i]),
+                run_days_limit=run_days_limits[i],
+                total_budget_limit=Decimal(budget_limits[i]),
+                max_txn_per_customer_per_day=txn_limits[i],
                 is_active=True,
             )
+            for i in range(count)
+        )
+
+        # One transaction, batched INSERTs instead of one roundtrip per row
+        with transaction.atomic():
+            Campaign.objects.bulk_create(objs, batch_size=1000)
+            # bulk_create skips post_save, so create the budget rows here
+            seeded_ids = Campaign.objects.filter(
+                name__in=[o.name for o in objs]
+            ).values_list("pk", flat=True)
+            CampaignBudget.objects.bulk_create(
+                [CampaignBudget(campaign_id=pk) for pk in seeded_ids], batch_size=1000
+            )
+
+            # Targeted campaign → assign specific customer
+            if users:
+                targeted = Campaign.objects.only("id").get(name=deterministic_campaigns[2].name)
+                Through = Campaign.specific_customers.through
+                Through.objects.bulk_create([
+                    Through(campaign_id=targeted.pk, user_id=users[0].pk),
+                ])
+
+            # bulk_create sends no post_save signals
+            bump_campaign_epoch()
+            forget_active_campaign_count()
 
-            total_created += 1
+        total_created = len(objs)
 
         # ---------------- OUTPUT ----------------
         self.stdout.write(self.style.SUCCESS(f"Total seeded campaigns: {total_created}"))
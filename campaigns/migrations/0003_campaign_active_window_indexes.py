@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-15 04:06
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campaigns', '0002_alter_campaignbudget_options_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='campaign',
+            name='campaigns_c_is_acti_7a198a_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='campaign',
+            name='campaigns_c_start_d_996cc8_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='campaignusagedaily',
+            name='campaigns_c_campaig_f5d28d_idx',
+        ),
+        migrations.AddIndex(
+            model_name='campaign',
+            index=models.Index(fields=['is_active', 'start_date', 'end_date'], name='camp_active_window'),
+        ),
+        migrations.AddIndex(
+            model_name='campaign',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['start_date', 'end_date'], name='camp_active_partial'),
+        ),
+    ]
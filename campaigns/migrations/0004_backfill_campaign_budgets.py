@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-15 04:12
+
+from django.db import migrations
+
+
+def create_missing_budgets(apps, schema_editor):
+    Campaign = apps.get_model('campaigns', 'Campaign')
+    CampaignBudget = apps.get_model('campaigns', 'CampaignBudget')
+    missing = Campaign.objects.filter(budget__isnull=True).values_list('pk', flat=True)
+    CampaignBudget.objects.bulk_create(
+        [CampaignBudget(campaign_id=pk) for pk in missing], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campaigns', '0003_campaign_active_window_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_missing_budgets, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-15 04:23
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campaigns', '0004_backfill_campaign_budgets'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='campaign',
+            index=models.Index(fields=['-created_at'], name='camp_created_desc'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-15 04:26
+
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campaigns', '0005_campaign_created_desc_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='campaign',
+            name='flat_discount_amount',
+            field=models.GeneratedField(db_persist=True, expression=models.Case(models.When(discount_type='FLAT', max_discount_amount__gt=0, then=django.db.models.functions.comparison.Least('discount_value', 'max_discount_amount')), models.When(discount_type='FLAT', then='discount_value'), default=None), output_field=models.DecimalField(decimal_places=2, max_digits=10, null=True)),
+        ),
+    ]
@@ -1,5 +1,7 @@
 from django.conf import settings
 from django.db import models
+from django.db.models.functions import Least
+from django.utils.functional import cached_property
 from decimal import Decimal
 from datetime import date, timedelta
 
@@ -38,6 +40,22 @@ class Campaign(TimeStamped):
         max_digits=10, decimal_places=2, null=True, blank=True
     )
 
+    # FLAT only: discount_value after the per-redemption cap, kept by the database
+    # so bulk previews read it instead of evaluating LEAST per row (NULL for PERCENT)
+    flat_discount_amount = models.GeneratedField(
+        expression=models.Case(
+            models.When(
+                discount_type=DiscountType.FLAT,
+                max_discount_amount__gt=0,
+                then=Least("discount_value", "max_discount_amount"),
+            ),
+            models.When(discount_type=DiscountType.FLAT, then="discount_value"),
+            default=None,
+        ),
+        output_field=models.DecimalField(max_digits=10, decimal_places=2, null=True),
+        db_persist=True,
+    )
+
     # targeting
     allow_all_customers = models.BooleanField(default=True)
     specific_customers = models.ManyToManyField(
@@ -83,24 +101,32 @@ class Campaign(TimeStamped):
             ),
         ]
         indexes = [
-            models.Index(fields=["is_active"]),
-            models.Index(fields=["start_date", "end_date"]),
+            # hot filter: is_active=True AND start_date <= today <= end_date
+            models.Index(fields=["is_active", "start_date", "end_date"], name="camp_active_window"),
+            models.Index(
+                fields=["start_date", "end_date"],
+                condition=models.Q(is_active=True),
+                name="camp_active_partial",
+            ),
+            # cursor pagination of the list endpoint orders by -created_at
+            models.Index(fields=["-created_at"], name="camp_created_desc"),
         ]
 
     def __str__(self) -> str:
         return f"{self.name} · {self.applies_to} · {self.discount_type}"
 
     # business helpers
-    def days_exhausted(self) -> bool:
+    def days_exhausted(self, today: date | None = None) -> bool:
         if not self.run_days_limit:
             return False
-        return date.today() > (self.start_date + timedelta(days=self.run_days_limit - 1))
+        today = today or date.today()
+        return today > (self.start_date + timedelta(days=self.run_days_limit - 1))
 
-    def is_within_date_window(self) -> bool:
-        today = date.today()
+    def is_within_date_window(self, today: date | None = None) -> bool:
+        today = today or date.today()
         return self.start_date <= today <= self.end_date
 
-    @property
+    @cached_property
     def remaining_budget(self) -> Decimal | None:
         """Convenience for admin – None if unlimited."""
         if self.total_budget_limit is None:
@@ -109,7 +135,7 @@ class Campaign(TimeStamped):
             return Decimal(self.total_budget_limit)
         return Decimal(self.total_budget_limit) - self.budget.total_discount_given
 
-    @property
+    @cached_property
     def days_left(self) -> int | None:
         """Remaining days considering run_days_limit + end_date; None if not started/ended or unlimited."""
         today = date.today()
@@ -151,7 +177,6 @@ class CampaignUsageDaily(TimeStamped):
     class Meta:
         unique_together = ("campaign", "customer", "usage_date")
         verbose_name_plural = "Campaign daily usage"
-        indexes = [models.Index(fields=["campaign", "customer", "usage_date"])]
 
     def __str__(self) -> str:
         return f"{self.usage_date} • {self.customer} • {self.campaign.name} • {self.txn_count} txn"
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from decimal import Decimal
+from decimal import Decimal, ROUND_DOWN
 
 from .models import Campaign
 
@@ -12,6 +12,10 @@ User = get_user_model()
 class CampaignSerializer(serializers.ModelSerializer):
     remaining_budget = serializers.SerializerMethodField(read_only=True)
     days_left = serializers.SerializerMethodField(read_only=True)
+    # generated column: a 2-dp string like the other money fields, not ModelField's float
+    flat_discount_amount = serializers.DecimalField(
+        max_digits=10, decimal_places=2, read_only=True, allow_null=True
+    )
 
     class Meta:
         model = Campaign
@@ -50,14 +54,42 @@ class CampaignSerializer(serializers.ModelSerializer):
 
         return attrs
 
+    # save() does not refresh generated fields; re-read it so the response is current
+    def create(self, validated_data):
+        instance = super().create(validated_data)
+        instance.refresh_from_db(fields=["flat_discount_amount"])
+        return instance
+
+    def update(self, instance, validated_data):
+        instance = super().update(instance, validated_data)
+        instance.refresh_from_db(fields=["flat_discount_amount"])
+        return instance
+
     def get_remaining_budget(self, obj: Campaign):
-        rb = obj.remaining_budget  # property on model
-        return None if rb is None else str(rb)
+        if hasattr(obj, "_remaining"):  # annotated by with_remaining_budget()
+            rb = obj._remaining
+        else:
+            rb = obj.remaining_budget  # property on model
+        # SQL arithmetic may drop trailing zeros (e.g. on SQLite); keep 2 dp
+        return None if rb is None else str(rb.quantize(Decimal("0.01")))
 
     def get_days_left(self, obj: Campaign):
         return obj.days_left
 
 
+class AvailableCampaignSerializer(serializers.Serializer):
+    """Read-only row of /campaigns/available/, built from preview_discounts_bulk() campaigns."""
+    campaign_id = serializers.IntegerField(source="id")
+    campaign_name = serializers.CharField(source="name")
+    applies_to = serializers.CharField()
+    # annotated by the bulk preview; rounded down like PreviewResult.discount_amount
+    discount_amount = serializers.DecimalField(
+        max_digits=12, decimal_places=2, source="effective_discount", rounding=ROUND_DOWN
+    )
+    discount_type = serializers.CharField()
+    discount_value = serializers.DecimalField(max_digits=10, decimal_places=2)
+
+
 class CartCheckSerializer(serializers.Serializer):
     customer_id = serializers.IntegerField()
     subtotal = serializers.DecimalField(max_digits=12, decimal_places=2)
@@ -1,26 +1,79 @@
 from __future__ import annotations
 
 from decimal import Decimal, ROUND_DOWN
-from typing import Optional, Dict, Any
+from typing import Optional, List, Tuple, NamedTuple
 from datetime import date
 
-from django.db import transaction
+from asgiref.sync import sync_to_async
+from django.db import connection, transaction
+from django.db.models import (
+    Case,
+    DateField,
+    DecimalField,
+    Exists,
+    F,
+    Func,
+    IntegerField,
+    OuterRef,
+    Q,
+    QuerySet,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce, Least
+from django.utils import timezone
 
+from .cache import bump_campaign_epoch
 from .models import Campaign, CampaignBudget, CampaignUsageDaily
 
+# shared Decimal constants (avoid re-parsing literals on every call)
+_D0 = Decimal("0.00")
+_D100 = Decimal(100)
+_QUANT = Decimal("0.01")
+
+# Campaign columns read on the preview/redeem paths (skips e.g. the unbounded description)
+PREVIEW_FIELDS = (
+    "id",
+    "name",
+    "applies_to",
+    "discount_type",
+    "discount_value",
+    "max_discount_amount",
+    "allow_all_customers",
+    "start_date",
+    "end_date",
+    "run_days_limit",
+    "total_budget_limit",
+    "max_txn_per_customer_per_day",
+    "is_active",
+)
+
+
+class PreviewResult(NamedTuple):
+    """Outcome of preview_discount / redeem_discount."""
+    applicable: bool
+    reason: Optional[str]  # set when applicable is False
+    discount_amount: Decimal
+    applies_to: str  # 'CART' | 'DELIVERY'
+
 
 class Cart:
-    """Lightweight cart DTO used by preview/redeem services."""
+    """
+    Lightweight cart DTO used by preview/redeem services.
+    customer may be a user instance or just its primary key; services only use customer_id.
+    """
     def __init__(self, customer, subtotal: Decimal, delivery: Decimal):
         self.customer = customer
-        self.subtotal = Decimal(subtotal)
-        self.delivery = Decimal(delivery)
+        self.customer_id = getattr(customer, "pk", customer)
+        # serializers already hand over Decimals; only parse other inputs
+        self.subtotal = subtotal if isinstance(subtotal, Decimal) else Decimal(subtotal)
+        self.delivery = delivery if isinstance(delivery, Decimal) else Decimal(delivery)
 
 
-def _eligible_customer(c: Campaign, user) -> bool:
+def _eligible_customer(c: Campaign, user_id: Optional[int]) -> bool:
     """True if the user is allowed to use campaign c."""
     if not c.allow_all_customers:
-        return c.specific_customers.filter(pk=getattr(user, "pk", None)).exists()
+        return c.specific_customers.filter(pk=user_id).exists()
     return True
 
 
@@ -28,56 +81,74 @@ def _budget_remaining(c: Campaign) -> Optional[Decimal]:
     """Remaining budget for campaign c, or None if unlimited."""
     if not c.total_budget_limit:
         return None
-    budget, _ = CampaignBudget.objects.get_or_create(campaign=c)
-    return Decimal(c.total_budget_limit) - budget.total_discount_given
+    # the budget row is created with the campaign (see signals.py)
+    if Campaign.budget.is_cached(c):
+        used = c.budget.total_discount_given if hasattr(c, "budget") else None
+    else:
+        used = (
+            CampaignBudget.objects.filter(campaign=c)
+            .values_list("total_discount_given", flat=True)
+            .first()
+        )
+    return c.total_budget_limit - (used or _D0)
 
 
-def _per_day_txn_left(c: Campaign, user) -> int:
+def _per_day_txn_left(c: Campaign, user_id: Optional[int], today: Optional[date] = None) -> int:
     """How many redemptions are left for user today on campaign c."""
-    record, _ = CampaignUsageDaily.objects.get_or_create(
-        campaign=c, customer=user, usage_date=date.today()
+    record = (
+        CampaignUsageDaily.objects
+        .filter(campaign=c, customer_id=user_id, usage_date=today or timezone.localdate())
+        .only("txn_count")
+        .first()
     )
-    return max(0, c.max_txn_per_customer_per_day - record.txn_count)
+    used = record.txn_count if record else 0
+    return max(0, c.max_txn_per_customer_per_day - used)
 
 
 def _compute_raw_discount(c: Campaign, amount: Decimal) -> Decimal:
     """Compute raw discount (pre-budget-cap) based on campaign rule."""
-    amount = max(Decimal("0.00"), Decimal(amount))
+    amount = max(_D0, amount)
     if c.discount_type == Campaign.DiscountType.PERCENT:
-        disc = (amount * Decimal(c.discount_value)) / Decimal(100)
+        disc = (amount * c.discount_value) / _D100
     else:  # FLAT
-        disc = Decimal(c.discount_value)
+        disc = c.discount_value
 
     if c.max_discount_amount:
-        disc = min(disc, Decimal(c.max_discount_amount))
+        disc = min(disc, c.max_discount_amount)
 
     # Normalize to 2 dp, never negative
-    return max(Decimal("0.00"), disc.quantize(Decimal("0.01"), rounding=ROUND_DOWN))
+    return max(_D0, disc.quantize(_QUANT, rounding=ROUND_DOWN))
+
+
+def _ineligible_reason(c: Campaign, user_id: Optional[int], today: date) -> Optional[str]:
+    """Why campaign c cannot be used by user today, or None if it can."""
+    if not (c.is_active and c.is_within_date_window(today) and not c.days_exhausted(today)):
+        return "Inactive or outside schedule."
+    if not _eligible_customer(c, user_id):
+        return "Customer not targeted."
+    if _per_day_txn_left(c, user_id, today) <= 0:
+        return "Daily usage limit reached."
+    return None
 
 
-def preview_discount(campaign: Campaign, cart: Cart) -> Dict[str, Any]:
+def preview_discount(
+    campaign: Campaign,
+    cart: Cart,
+    *,
+    today: Optional[date] = None,
+) -> PreviewResult:
     """
     Check if a campaign applies to the given cart and compute the discount (without mutating state).
+    today: evaluation date, defaults to timezone.localdate(); views compute it once per request.
 
-    Returns a dict:
-      {
-        'applicable': bool,
-        'reason': str (present when applicable is False),
-        'discount_amount': Decimal,
-        'applies_to': 'CART' | 'DELIVERY'
-      }
+    Returns a PreviewResult; reason is None when applicable is True.
     """
     c = campaign
-    reason = None
-
-    # Global checks: status, window, run-days limit
-    if not (c.is_active and c.is_within_date_window() and not c.days_exhausted()):
-        reason = "Inactive or outside schedule."
-    elif not _eligible_customer(c, cart.customer):
-        reason = "Customer not targeted."
-    elif _per_day_txn_left(c, cart.customer) <= 0:
-        reason = "Daily usage limit reached."
-    else:
+    today = today or timezone.localdate()
+
+    # Global checks: status, window, run-days limit, targeting, daily limit
+    reason = _ineligible_reason(c, cart.customer_id, today)
+    if reason is None:
         base = cart.subtotal if c.applies_to == c.AppliesTo.CART else cart.delivery
         if base <= 0:
             reason = "Nothing to discount."
@@ -93,52 +164,269 @@ def preview_discount(campaign: Campaign, cart: Cart) -> Dict[str, Any]:
                     disc = min(disc, remaining)
 
             if not reason and disc > 0:
-                return {
-                    "applicable": True,
-                    "applies_to": c.applies_to,
-                    "discount_amount": disc,
-                }
+                return PreviewResult(True, None, disc, c.applies_to)
+
+    return PreviewResult(False, reason or "Not applicable.", _D0, c.applies_to)
+
 
-    return {
-        "applicable": False,
-        "reason": reason or "Not applicable.",
-        "discount_amount": Decimal("0.00"),
-        "applies_to": c.applies_to,
-    }
+# Wide enough to hold amount(2dp) * percent(2dp) / 100 exactly, so the SQL
+# result can be rounded down to cents in Python exactly like _compute_raw_discount.
+_WIDE_DECIMAL = DecimalField(max_digits=24, decimal_places=6)
+
+
+def _annotate_discount(qs: QuerySet, cart: Cart) -> QuerySet:
+    """
+    Annotate ``effective_discount`` on each campaign: the discount for this
+    cart after the per-redemption cap and the remaining budget, computed in SQL.
+    """
+    base = Case(
+        When(applies_to=Campaign.AppliesTo.CART, then=Value(max(_D0, cart.subtotal))),
+        default=Value(max(_D0, cart.delivery)),
+        output_field=_WIDE_DECIMAL,
+    )
+    # multiply by 0.01 rather than divide by 100: avoids integer division on SQLite
+    percent = base * F("discount_value") * Value(_QUANT)
+    capped = Case(
+        # FLAT: already capped by the stored generated column
+        When(discount_type=Campaign.DiscountType.FLAT, then=F("flat_discount_amount")),
+        When(max_discount_amount__gt=0, then=Least(percent, F("max_discount_amount"))),
+        default=percent,
+        output_field=_WIDE_DECIMAL,
+    )
+    budget_left = F("total_budget_limit") - Coalesce(
+        F("budget__total_discount_given"), Value(_D0), output_field=_WIDE_DECIMAL
+    )
+    return qs.annotate(
+        effective_discount=Case(
+            When(total_budget_limit__gt=0, then=Least(capped, budget_left)),
+            default=capped,
+            output_field=_WIDE_DECIMAL,
+        )
+    )
+
+
+def with_remaining_budget(qs: QuerySet) -> QuerySet:
+    """
+    Annotate ``_remaining``: total_budget_limit minus discount given so far
+    (None if unlimited), so serializers don't hit the budget row per campaign.
+    """
+    return qs.annotate(
+        _remaining=Case(
+            When(total_budget_limit__isnull=True, then=Value(None)),
+            default=F("total_budget_limit") - Coalesce(F("budget__total_discount_given"), Value(_D0)),
+            output_field=DecimalField(max_digits=12, decimal_places=2),
+        )
+    )
+
+
+class _DaysBetween(Func):
+    """Whole days from the second date expression to the first (end - start)."""
+    output_field = IntegerField()
+    template = "(%(expressions)s)"
+    arg_joiner = " - "
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler,
+            connection,
+            template="CAST(julianday(%(expressions)s) AS INTEGER)",
+            arg_joiner=") - julianday(",
+            **extra_context,
+        )
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler, connection, template="DATEDIFF(%(expressions)s)", arg_joiner=", ", **extra_context
+        )
+
+
+def _applicable_campaigns(campaigns: QuerySet, user_id: Optional[int], today: date) -> QuerySet:
+    """
+    Narrow ``campaigns`` in SQL to those user_id may redeem today: active, in
+    the date window, within run_days_limit, targeted at the user and below the
+    per-day transaction limit. Mirrors _ineligible_reason.
+    """
+    targeted = Campaign.specific_customers.through.objects.filter(
+        campaign_id=OuterRef("pk"), user_id=user_id
+    )
+    limit_reached = CampaignUsageDaily.objects.filter(
+        campaign_id=OuterRef("pk"),
+        customer_id=user_id,
+        usage_date=today,
+        txn_count__gte=OuterRef("max_txn_per_customer_per_day"),
+    )
+    days_running = _DaysBetween(Value(today, output_field=DateField()), F("start_date"))
+    return (
+        campaigns
+        .filter(
+            is_active=True,
+            start_date__lte=today,
+            end_date__gte=today,
+            max_txn_per_customer_per_day__gt=0,
+        )
+        .filter(
+            Q(run_days_limit__isnull=True)
+            | Q(run_days_limit=0)
+            | Q(run_days_limit__gt=days_running)
+        )
+        .filter(Q(allow_all_customers=True) | Exists(targeted))
+        .exclude(Exists(limit_reached))
+    )
+
+
+def preview_discounts_bulk(
+    campaigns: QuerySet, cart: Cart, *, today: Optional[date] = None
+) -> List[Tuple[Campaign, PreviewResult]]:
+    """
+    Preview many campaigns for one cart in a single query.
+
+    Eligibility (_applicable_campaigns) and the discount after the per-redemption
+    cap and remaining budget (_annotate_discount) are evaluated in SQL; only
+    campaigns with a positive discount come back. Returns ``(campaign, preview)``
+    pairs for the applicable campaigns only.
+    """
+    today = today or timezone.localdate()
+    qs = _applicable_campaigns(campaigns, cart.customer_id, today).only(*PREVIEW_FIELDS)
+    # "Nothing to discount." in preview_discount: FLAT amounts don't depend on the base
+    empty = [
+        applies_to
+        for applies_to, base in (
+            (Campaign.AppliesTo.CART, cart.subtotal),
+            (Campaign.AppliesTo.DELIVERY, cart.delivery),
+        )
+        if base <= 0
+    ]
+    if empty:
+        qs = qs.exclude(applies_to__in=empty)
+    qs = _annotate_discount(qs, cart).filter(effective_discount__gt=0)
+
+    results = []
+    # stream rows (server-side cursor on PostgreSQL) instead of caching the whole result set
+    for c in qs.iterator(chunk_size=200):
+        disc = c.effective_discount.quantize(_QUANT, rounding=ROUND_DOWN)
+        if disc > 0:
+            results.append((c, PreviewResult(True, None, disc, c.applies_to)))
+    return results
+
+
+def _upsert_daily_usage(c: Campaign, user_id: int, usage_date: date) -> bool:
+    """
+    Insert or increment the usage row in one statement:
+    INSERT ... ON CONFLICT DO UPDATE ... WHERE txn_count < limit RETURNING txn_count.
+    No row comes back when the conflict branch is skipped, i.e. the limit is reached.
+    """
+    opts = CampaignUsageDaily._meta
+    qn = connection.ops.quote_name
+    table = qn(opts.db_table)
+    col = {name: qn(opts.get_field(name).column) for name in (
+        "campaign", "customer", "usage_date", "txn_count", "created_at", "updated_at",
+    )}
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    sql = (
+        f"INSERT INTO {table} ({col['campaign']}, {col['customer']}, {col['usage_date']}, "
+        f"{col['txn_count']}, {col['created_at']}, {col['updated_at']}) "
+        f"VALUES (%s, %s, %s, 1, %s, %s) "
+        f"ON CONFLICT ({col['campaign']}, {col['customer']}, {col['usage_date']}) DO UPDATE "
+        f"SET {col['txn_count']} = {table}.{col['txn_count']} + 1, "
+        f"{col['updated_at']} = EXCLUDED.{col['updated_at']} "
+        f"WHERE {table}.{col['txn_count']} < %s "
+        f"RETURNING {col['txn_count']}"
+    )
+    params = [
+        c.pk,
+        user_id,
+        connection.ops.adapt_datefield_value(usage_date),
+        now,
+        now,
+        c.max_txn_per_customer_per_day,
+    ]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchone() is not None
+
+
+def _increment_daily_usage(c: Campaign, user_id: int, usage_date: date) -> bool:
+    """
+    Count one redemption for (c, user_id, usage_date).
+    Returns False if the per-day limit is already reached.
+    """
+    if c.max_txn_per_customer_per_day <= 0:
+        return False
+    features = connection.features
+    if features.supports_update_conflicts_with_target and features.can_return_columns_from_insert:
+        return _upsert_daily_usage(c, user_id, usage_date)
+
+    # no upsert with RETURNING (e.g. MySQL): conditional UPDATE, then create
+    usage = CampaignUsageDaily.objects.filter(
+        campaign=c,
+        customer_id=user_id,
+        usage_date=usage_date,
+        txn_count__lt=c.max_txn_per_customer_per_day,
+    )
+    if usage.update(txn_count=F("txn_count") + 1):
+        return True
+    # no row below the limit: make sure the row exists (no-op if it does), then
+    # retry; the WHERE clause alone decides whether the limit is reached
+    CampaignUsageDaily.objects.bulk_create(
+        [CampaignUsageDaily(campaign=c, customer_id=user_id, usage_date=usage_date, txn_count=0)],
+        ignore_conflicts=True,
+    )
+    return bool(usage.update(txn_count=F("txn_count") + 1))
+
+
+def _add_to_budget(c: Campaign, amount: Decimal) -> bool:
+    """
+    Add amount to the campaign's total_discount_given with one conditional
+    UPDATE that only matches while the total stays within total_budget_limit.
+    Returns False (nothing written) if the budget cannot cover amount.
+    """
+    within_limit = CampaignBudget.objects.filter(
+        campaign=c, total_discount_given__lte=c.total_budget_limit - amount
+    )
+    added = within_limit.update(total_discount_given=F("total_discount_given") + amount)
+    if not added:
+        # campaign without a budget row (e.g. loaded from a fixture)
+        CampaignBudget.objects.bulk_create([CampaignBudget(campaign=c)], ignore_conflicts=True)
+        added = within_limit.update(total_discount_given=F("total_discount_given") + amount)
+    # any budget row cached on the instance is now stale
+    if Campaign.budget.is_cached(c):
+        Campaign.budget.related.delete_cached_value(c)
+    return bool(added)
 
 
 @transaction.atomic
-def redeem_discount(campaign: Campaign, cart: Cart) -> Dict[str, Any]:
+def redeem_discount(
+    campaign: Campaign, cart: Cart, *, today: Optional[date] = None
+) -> PreviewResult:
     """
     Apply and persist a redemption atomically:
       - re-validates with preview
-      - increments daily usage (with SELECT ... FOR UPDATE)
-      - increments total budget used (if capped)
+      - increments daily usage (single upsert, only while below the per-day limit)
+      - increments total budget used (if capped), only while it stays within the limit
     """
-    prev = preview_discount(campaign, cart)
-    if not prev.get("applicable"):
+    today = today or timezone.localdate()
+    prev = preview_discount(campaign, cart, today=today)
+    if not prev.applicable:
         return prev
 
-    disc = prev["discount_amount"]
+    disc = prev.discount_amount
 
-    # Lock the usage row for (campaign, customer, today)
-    daily, _ = CampaignUsageDaily.objects.select_for_update().get_or_create(
-        campaign=campaign, customer=cart.customer, usage_date=date.today()
-    )
-    if daily.txn_count >= campaign.max_txn_per_customer_per_day:
-        return {"applicable": False, "reason": "Race: daily limit reached."}
-
-    daily.txn_count += 1
-    daily.save()
-
-    # Update budget if capped; lock the row to avoid races
-    if campaign.total_budget_limit:
-        budget, _ = CampaignBudget.objects.select_for_update().get_or_create(campaign=campaign)
-        budget.total_discount_given += disc
-        budget.save()
-
-    return {
-        "applicable": True,
-        "discount_amount": disc,
-        "applies_to": campaign.applies_to,
-    }
+    if not _increment_daily_usage(campaign, cart.customer_id, today):
+        return PreviewResult(False, "Race: daily limit reached.", _D0, campaign.applies_to)
+
+    if campaign.total_budget_limit and not _add_to_budget(campaign, disc):
+        # a concurrent redemption used the budget up: undo the usage increment
+        transaction.set_rollback(True)
+        return PreviewResult(False, "Race: budget exhausted.", _D0, campaign.applies_to)
+
+    # usage/budget changed: cached /available/ responses may be stale
+    bump_campaign_epoch()
+    return PreviewResult(True, None, disc, campaign.applies_to)
+
+
+# Async entry points for async views / workers. Django's a*() QuerySet methods
+# run the query through sync_to_async anyway, and redeem needs transaction.atomic,
+# which has no async form, so these run the sync services in the DB thread.
+apreview_discount = sync_to_async(preview_discount)
+apreview_discounts_bulk = sync_to_async(preview_discounts_bulk)
+aredeem_discount = sync_to_async(redeem_discount)
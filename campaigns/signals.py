@@ -0,0 +1,27 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import bump_campaign_epoch, forget_active_campaign_count
+from .models import Campaign, CampaignBudget
+
+
+@receiver(post_save, sender=Campaign)
+def ensure_campaign_budget(sender, instance: Campaign, created: bool, raw: bool = False, **kwargs):
+    """Create the budget row together with its campaign so readers never need get_or_create."""
+    if created and not raw:
+        CampaignBudget.objects.create(campaign=instance)
+
+
+@receiver(post_save, sender=Campaign)
+@receiver(post_delete, sender=Campaign)
+@receiver(m2m_changed, sender=Campaign.specific_customers.through)
+def invalidate_available_cache(sender, **kwargs):
+    """Any campaign change may change which campaigns a cart can use."""
+    bump_campaign_epoch()
+
+
+@receiver(post_save, sender=Campaign)
+@receiver(post_delete, sender=Campaign)
+def invalidate_active_count(sender, **kwargs):
+    """Creating, (de)activating or deleting a campaign may change the active count."""
+    forget_active_campaign_count()
@@ -1,19 +1,36 @@
 from decimal import Decimal
 from datetime import timedelta, date
+from unittest import mock
 
-from django.test import TestCase
+from django.db import connection
+from django.db.models import F, Value
+from django.test import TestCase, override_settings
 from django.contrib.auth.models import User
 from django.utils import timezone
 
 from .models import Campaign, CampaignBudget, CampaignUsageDaily
-from .services import Cart, preview_discount, redeem_discount
+from .services import (
+    Cart,
+    _DaysBetween,
+    _add_to_budget,
+    _increment_daily_usage,
+    apreview_discount,
+    aredeem_discount,
+    preview_discount,
+    preview_discounts_bulk,
+    redeem_discount,
+)
 
 
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
 class CampaignRulesTest(TestCase):
     """Unit tests to ensure core discount business rules work correctly."""
 
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='u1', password='x')
+
     def setUp(self):
-        self.user = User.objects.create_user(username='u1', password='x')
         today = timezone.now().date()
 
         # Base campaign used in most tests
@@ -37,17 +54,22 @@ class CampaignRulesTest(TestCase):
         cart = Cart(self.user, Decimal('500.00'), Decimal('50.00'))
         p = preview_discount(self.camp, cart)
 
-        self.assertTrue(p["applicable"])
-        self.assertEqual(p["applies_to"], Campaign.AppliesTo.CART)
-        self.assertEqual(p["discount_amount"], Decimal('50.00'))  # 10% of 500
+        self.assertTrue(p.applicable)
+        self.assertEqual(p.applies_to, Campaign.AppliesTo.CART)
+        self.assertEqual(p.discount_amount, Decimal('50.00'))  # 10% of 500
+
+    def test_budget_row_created_with_campaign(self):
+        """Saving a new campaign creates its zeroed budget row."""
+        budget = CampaignBudget.objects.get(campaign=self.camp)
+        self.assertEqual(budget.total_discount_given, Decimal('0'))
 
     def test_budget_and_usage_update_on_redeem(self):
         """Redeem should update campaign budget and daily usage row."""
         cart = Cart(self.user, Decimal('500.00'), Decimal('50.00'))
 
         r = redeem_discount(self.camp, cart)
-        self.assertTrue(r["applicable"])
-        self.assertEqual(r["discount_amount"], Decimal('50.00'))
+        self.assertTrue(r.applicable)
+        self.assertEqual(r.discount_amount, Decimal('50.00'))
 
         # Budget updated
         budget = CampaignBudget.objects.get(campaign=self.camp)
@@ -57,7 +79,7 @@ class CampaignRulesTest(TestCase):
         usage = CampaignUsageDaily.objects.get(
             campaign=self.camp,
             customer=self.user,
-            usage_date=date.today(),
+            usage_date=timezone.localdate(),
         )
         self.assertEqual(usage.txn_count, 1)
 
@@ -66,11 +88,52 @@ class CampaignRulesTest(TestCase):
         cart = Cart(self.user, Decimal('300.00'), Decimal('20.00'))
 
         first = redeem_discount(self.camp, cart)
-        self.assertTrue(first["applicable"])
+        self.assertTrue(first.applicable)
 
         second = redeem_discount(self.camp, cart)
-        self.assertFalse(second["applicable"])
-        self.assertIn("limit", second["reason"].lower())
+        self.assertFalse(second.applicable)
+        self.assertIn("limit", second.reason.lower())
+
+    def test_daily_usage_upsert_stops_at_limit(self):
+        """Usage counter is created, incremented, and never pushed past the daily limit."""
+        self.camp.max_txn_per_customer_per_day = 2
+        today = date.today()
+
+        self.assertTrue(_increment_daily_usage(self.camp, self.user.pk, today))
+        self.assertTrue(_increment_daily_usage(self.camp, self.user.pk, today))
+        self.assertFalse(_increment_daily_usage(self.camp, self.user.pk, today))
+
+        usage = CampaignUsageDaily.objects.get(campaign=self.camp, customer=self.user, usage_date=today)
+        self.assertEqual(usage.txn_count, 2)
+        self.assertIsNotNone(usage.created_at)
+
+    def test_budget_update_never_exceeds_limit(self):
+        """The conditional budget UPDATE refuses amounts the remaining budget cannot cover."""
+        self.assertTrue(_add_to_budget(self.camp, Decimal('999.99')))
+        self.assertFalse(_add_to_budget(self.camp, Decimal('0.02')))
+        self.assertTrue(_add_to_budget(self.camp, Decimal('0.01')))
+
+        budget = CampaignBudget.objects.get(campaign=self.camp)
+        self.assertEqual(budget.total_discount_given, Decimal('1000.00'))
+
+    def test_lost_budget_race_rolls_back_usage(self):
+        """A failed conditional budget UPDATE undoes the usage upsert of the same redeem."""
+        self.camp.max_txn_per_customer_per_day = 2
+        cart = Cart(self.user, Decimal('100.00'), Decimal('10.00'))
+        usage = CampaignUsageDaily.objects.filter(campaign=self.camp, customer=self.user)
+
+        with mock.patch('campaigns.services._add_to_budget', return_value=False):
+            r = redeem_discount(self.camp, cart)
+        self.assertFalse(r.applicable)
+        self.assertEqual(r.reason, 'Race: budget exhausted.')
+        self.assertEqual(r.discount_amount, Decimal('0'))
+        self.assertFalse(usage.exists())  # inserted row rolled back
+
+        self.assertTrue(redeem_discount(self.camp, cart).applicable)
+        with mock.patch('campaigns.services._add_to_budget', return_value=False):
+            self.assertFalse(redeem_discount(self.camp, cart).applicable)
+        self.assertEqual(usage.get().txn_count, 1)  # increment rolled back
+        self.assertEqual(CampaignBudget.objects.get(campaign=self.camp).total_discount_given, Decimal('10.00'))
 
     def test_budget_cap_stops_campaign(self):
         """When total budget is fully used, campaign becomes not applicable (budget exhausted)."""
@@ -83,16 +146,16 @@ class CampaignRulesTest(TestCase):
 
         # First preview: discount capped to remaining budget (40)
         p = preview_discount(self.camp, cart)
-        self.assertTrue(p["applicable"])
-        self.assertEqual(p["discount_amount"], Decimal('40.00'))
+        self.assertTrue(p.applicable)
+        self.assertEqual(p.discount_amount, Decimal('40.00'))
 
         # Redeem once → consumes full budget
         redeem_discount(self.camp, cart)
 
         # Now budget exhausted → preview should fail due to budget
         p2 = preview_discount(self.camp, cart)
-        self.assertFalse(p2["applicable"])
-        self.assertIn("budget", p2["reason"].lower())
+        self.assertFalse(p2.applicable)
+        self.assertIn("budget", p2.reason.lower())
 
     def test_date_window_blocked(self):
         """Campaign outside start/end date should not apply."""
@@ -102,8 +165,8 @@ class CampaignRulesTest(TestCase):
         cart = Cart(self.user, Decimal('500.00'), Decimal('50.00'))
         p = preview_discount(self.camp, cart)
 
-        self.assertFalse(p["applicable"])
-        self.assertIn("inactive", p["reason"].lower())
+        self.assertFalse(p.applicable)
+        self.assertIn("inactive", p.reason.lower())
 
     def test_targeted_customer_only(self):
         """If allow_all_customers=False, only specific_customers can use the campaign."""
@@ -116,10 +179,85 @@ class CampaignRulesTest(TestCase):
         # Allowed user
         cart1 = Cart(self.user, Decimal('200.00'), Decimal('20.00'))
         p1 = preview_discount(self.camp, cart1)
-        self.assertTrue(p1["applicable"])
+        self.assertTrue(p1.applicable)
 
         # Not allowed user
         cart2 = Cart(other_user, Decimal('200.00'), Decimal('20.00'))
         p2 = preview_discount(self.camp, cart2)
-        self.assertFalse(p2["applicable"])
-        self.assertIn("target", p2["reason"].lower())
+        self.assertFalse(p2.applicable)
+        self.assertIn("target", p2.reason.lower())
+
+    def test_bulk_preview_matches_single_preview(self):
+        """Bulk preview returns only applicable campaigns, with the same amounts as preview_discount."""
+        Campaign.objects.create(
+            name='Flat30',
+            applies_to=Campaign.AppliesTo.DELIVERY,
+            discount_type=Campaign.DiscountType.FLAT,
+            discount_value=Decimal('30'),
+            max_discount_amount=Decimal('25.00'),
+            start_date=self.camp.start_date,
+            end_date=self.camp.end_date,
+        )
+        Campaign.objects.create(
+            name='Pct15',
+            applies_to=Campaign.AppliesTo.CART,
+            discount_type=Campaign.DiscountType.PERCENT,
+            discount_value=Decimal('15'),
+            total_budget_limit=Decimal('500.00'),
+            start_date=self.camp.start_date,
+            end_date=self.camp.end_date,
+        )
+        cart = Cart(self.user, Decimal('333.33'), Decimal('50.00'))
+        redeem_discount(self.camp, cart)  # daily limit of Test10 now reached
+
+        with self.assertNumQueries(1):
+            results = preview_discounts_bulk(Campaign.objects.order_by('name'), cart)
+
+        self.assertEqual([c.name for c, _ in results], ['Flat30', 'Pct15'])
+        for c, p in results:
+            self.assertEqual(p, preview_discount(c, cart))
+
+        # nothing to discount on a free delivery: the flat delivery campaign drops out
+        free_delivery = Cart(self.user, Decimal('333.33'), Decimal('0.00'))
+        flat30 = Campaign.objects.get(name='Flat30')
+        self.assertFalse(preview_discount(flat30, free_delivery).applicable)
+        self.assertEqual(
+            [c.name for c, _ in preview_discounts_bulk(Campaign.objects.all(), free_delivery)],
+            ['Pct15'],
+        )
+        self.assertEqual(results[0][1].discount_amount, Decimal('25.00'))  # flat 30 capped at 25
+        self.assertEqual(results[1][1].discount_amount, Decimal('49.99'))  # 49.9995 rounded down
+
+    def test_bulk_preview_resolves_targeting_in_sql(self):
+        """Targeted campaigns are checked inside the single bulk query."""
+        other_user = User.objects.create_user(username='other', password='x')
+        self.camp.allow_all_customers = False
+        self.camp.save()
+        self.camp.specific_customers.set([self.user])
+
+        cart1 = Cart(self.user, Decimal('200.00'), Decimal('20.00'))
+        with self.assertNumQueries(1):
+            [(_, p1)] = preview_discounts_bulk(Campaign.objects.all(), cart1)
+        self.assertTrue(p1.applicable)
+
+        cart2 = Cart(other_user, Decimal('200.00'), Decimal('20.00'))
+        self.assertEqual(preview_discounts_bulk(Campaign.objects.all(), cart2), [])
+
+    def test_days_between_renders_datediff_for_mysql(self):
+        """The MySQL variant must call DATEDIFF, not emit a bare row constructor."""
+        qs = Campaign.objects.annotate(d=_DaysBetween(Value(date.today()), F('start_date')))
+        compiler = qs.query.get_compiler(connection=connection)
+        sql, _ = qs.query.annotations['d'].as_mysql(compiler, connection)
+        self.assertTrue(sql.startswith('DATEDIFF(%s, '), sql)
+
+    async def test_async_preview_and_redeem(self):
+        """Async variants return the same results as the sync services."""
+        cart = Cart(self.user, Decimal('500.00'), Decimal('50.00'))
+
+        p = await apreview_discount(self.camp, cart)
+        self.assertEqual(p.discount_amount, Decimal('50.00'))
+
+        first = await aredeem_discount(self.camp, cart)
+        self.assertTrue(first.applicable)
+        second = await aredeem_discount(self.camp, cart)
+        self.assertFalse(second.applicable)
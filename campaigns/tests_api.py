@@ -1,31 +1,50 @@
-from datetime import timedelta
+import json
+import uuid
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
 
 from django.contrib.auth.models import User
+from django.test import SimpleTestCase, override_settings
 from django.urls import reverse
 from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APITestCase, APIClient
 
+from .cache import active_campaign_count
+from .models import Campaign
+from .renderers import ORJSONRenderer
 
+
+@override_settings(
+    DEBUG=False,
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],
+)
 class CampaignIntegrationAPITests(APITestCase):
     """
     End-to-end test of:
     - Admin CRUD on /api/campaigns/
     - /api/campaigns/available/ (GET + POST)
     - /api/campaigns/redeem/
+    - /api/campaigns/summary/
     """
 
-    def setUp(self):
-        self.admin = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        # users and URLs are shared by every test in the class (rolled back per test)
+        cls.admin = User.objects.create_user(
             username="admin", password="x", is_staff=True
         )
-        self.client_admin = APIClient()
-        self.client_admin.force_authenticate(self.admin)
+        cls.customer = User.objects.create_user(username="cust1", password="x")
 
-        self.customer = User.objects.create_user(username="cust1", password="x")
+        cls.list_url = reverse("campaign-list")
+        cls.available_url = reverse("campaign-available")
+        cls.redeem_url = reverse("campaign-redeem")
+        cls.summary_url = reverse("campaign-summary")
 
-        self.list_url = reverse("campaign-list")
-        self.available_url = reverse("campaign-available")
-        self.redeem_url = reverse("campaign-redeem")
+    def setUp(self):
+        self.client_admin = APIClient()
+        self.client_admin.force_authenticate(self.admin)
 
         today = timezone.now().date()
         self.campaign_payload = {
@@ -44,70 +63,215 @@ class CampaignIntegrationAPITests(APITestCase):
             "is_active": True,
         }
 
-    def test_crud_available_and_redeem_flow(self):
+    def _redeem(self, camp_id):
+        return self.client_admin.post(
+            self.redeem_url,
+            {
+                "campaign_id": camp_id,
+                "customer_id": self.customer.id,
+                "subtotal": "1200.00",
+                "delivery": "80.00",
+            },
+            format="json",
+        )
+
+    def test_crud(self):
         create_res = self.client_admin.post(self.list_url, self.campaign_payload, format="json")
         self.assertEqual(create_res.status_code, 201, create_res.data)
         camp_id = create_res.data["id"]
 
         list_res = self.client_admin.get(self.list_url)
         self.assertEqual(list_res.status_code, 200)
+        self.assertEqual(list_res.data["results"][0]["remaining_budget"], "500.00")
+        self.assertNotIn("count", list_res.data)  # cursor pagination, no COUNT(*)
 
-        get_res = self.client_admin.get(
-            self.available_url,
-            {"customer_id": self.customer.id, "subtotal": "1200.00", "delivery": "80.00"},
+        patch_res = self.client_admin.patch(
+            reverse("campaign-detail", args=[camp_id]),
+            {"is_active": False},
+            format="json",
         )
-        self.assertEqual(get_res.status_code, 200, get_res.data)
-        self.assertTrue(len(get_res.data["available_campaigns"]) >= 1)
+        self.assertEqual(patch_res.status_code, 200)
+        self.assertEqual(patch_res.data["is_active"], False)
 
-        post_res = self.client_admin.post(
-            self.available_url,
-            {
-                "customer_id": self.customer.id,
-                "subtotal": "1200.00",
-                "delivery": "80.00",
-            },
-            format="json",
+        del_res = self.client_admin.delete(
+            reverse("campaign-detail", args=[camp_id])
         )
-        self.assertEqual(post_res.status_code, 200, post_res.data)
-        self.assertTrue(len(post_res.data["available_campaigns"]) >= 1)
+        self.assertIn(del_res.status_code, (200, 204))
 
-        redeem_ok = self.client_admin.post(
-            self.redeem_url,
-            {
-                "campaign_id": camp_id,
-                "customer_id": self.customer.id,
-                "subtotal": "1200.00",
-                "delivery": "80.00",
-            },
+    def test_flat_discount_amount_follows_writes(self):
+        create_res = self.client_admin.post(self.list_url, self.campaign_payload, format="json")
+        self.assertEqual(create_res.status_code, 201, create_res.data)
+        self.assertIsNone(create_res.data["flat_discount_amount"])  # PERCENT
+        detail_url = reverse("campaign-detail", args=[create_res.data["id"]])
+
+        patch_res = self.client_admin.patch(
+            detail_url,
+            {"discount_type": "FLAT", "discount_value": "10.00", "max_discount_amount": None},
             format="json",
         )
+        self.assertEqual(patch_res.status_code, 200, patch_res.data)
+        self.assertEqual(patch_res.data["flat_discount_amount"], "10.00")
+        self.assertEqual(self.client_admin.get(detail_url).json()["flat_discount_amount"], "10.00")
+
+    def test_available_get_and_post(self):
+        self.client_admin.post(self.list_url, self.campaign_payload, format="json")
+        cart = {"customer_id": self.customer.id, "subtotal": "1200.00", "delivery": "80.00"}
+
+        get_res = self.client.get(self.available_url, cart)
+        self.assertEqual(get_res.status_code, 200, get_res.data)
+        self.assertEqual(json.loads(get_res.content), get_res.data)
+        [row] = get_res.data["available_campaigns"]
+        self.assertEqual(row["discount_amount"], "200.00")  # 20% of 1200 capped at 200
+        self.assertEqual(row["discount_value"], "20.00")
+
+        post_res = self.client_admin.post(self.available_url, cart, format="json")
+        self.assertEqual(post_res.status_code, 200, post_res.data)
+        self.assertEqual(post_res.data["available_campaigns"], get_res.data["available_campaigns"])
+
+    def test_redeem_ok_then_capped(self):
+        camp_id = self.client_admin.post(self.list_url, self.campaign_payload, format="json").data["id"]
+
+        redeem_ok = self._redeem(camp_id)
         self.assertEqual(redeem_ok.status_code, 200, redeem_ok.data)
         self.assertTrue(redeem_ok.data["applicable"])
-        self.assertIn("discount_amount", redeem_ok.data)
+        self.assertEqual(redeem_ok.data["discount_amount"], "200.00")
 
-        redeem_cap = self.client_admin.post(
-            self.redeem_url,
-            {
-                "campaign_id": camp_id,
-                "customer_id": self.customer.id,
-                "subtotal": "1200.00",
-                "delivery": "80.00",
-            },
-            format="json",
-        )
+        redeem_cap = self._redeem(camp_id)
         self.assertEqual(redeem_cap.status_code, 400, redeem_cap.data)
         self.assertFalse(redeem_cap.data["applicable"])
         self.assertIn("limit", redeem_cap.data["reason"].lower())
 
-        patch_res = self.client_admin.patch(
-            reverse("campaign-detail", args=[camp_id]),
-            {"is_active": False},
+    def test_summary_lists_campaigns(self):
+        create_res = self.client_admin.post(self.list_url, self.campaign_payload, format="json")
+        self.assertEqual(create_res.status_code, 201, create_res.data)
+
+        res = self.client.get(self.summary_url)
+        self.assertEqual(res.status_code, 200)
+        [row] = res.json()["results"]
+        self.assertEqual(row["id"], create_res.data["id"])
+        self.assertEqual(row["discount_value"], "20.00")
+        self.assertEqual(row["remaining_budget"], "500.00")
+        self.assertNotIn("description", row)
+
+    def test_available_query_count_is_constant(self):
+        today = timezone.localdate()
+        for i in range(5):
+            Campaign.objects.create(
+                name=f"QC {i}",
+                discount_value=Decimal("10"),
+                start_date=today - timedelta(days=1),
+                end_date=today + timedelta(days=1),
+            )
+
+        active_campaign_count()  # warm the cached count the signals just cleared
+
+        # user lookup + one campaigns query (eligibility and discount in SQL)
+        with self.assertNumQueries(2):
+            res = self.client.get(
+                self.available_url,
+                {"customer_id": self.customer.id, "subtotal": "100.00", "delivery": "10.00"},
+            )
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(len(res.data["available_campaigns"]), 5)
+
+    def test_available_skips_queries_without_active_campaigns(self):
+        Campaign.objects.create(
+            name="Inactive",
+            discount_value=Decimal("10"),
+            start_date=timezone.localdate(),
+            end_date=timezone.localdate(),
+            is_active=False,
+        )
+        params = {"customer_id": self.customer.id, "subtotal": "100.00", "delivery": "10.00"}
+        self.assertEqual(self.client.get(self.available_url, params).data["available_campaigns"], [])
+
+        with self.assertNumQueries(1):  # user lookup only, even for a new cart shape
+            res = self.client.get(self.available_url, {**params, "subtotal": "55.00"})
+        self.assertEqual(res.data["available_campaigns"], [])
+
+    def test_unknown_customer_returns_404(self):
+        res = self.client.get(
+            self.available_url,
+            {"customer_id": 999999, "subtotal": "100.00", "delivery": "10.00"},
+        )
+        self.assertEqual(res.status_code, 404)
+
+    def test_available_rejects_malformed_amounts(self):
+        res = self.client.get(
+            self.available_url,
+            {"customer_id": self.customer.id, "subtotal": "abc", "delivery": "10.00"},
+        )
+        self.assertEqual(res.status_code, 400)
+        self.assertIn("subtotal", res.data)
+
+        res = self.client.get(self.available_url, {"customer_id": self.customer.id, "subtotal": "5"})
+        self.assertEqual(res.status_code, 400)
+        self.assertIn("delivery", res.data)
+
+    def test_available_is_cached_until_campaign_data_changes(self):
+        today = timezone.localdate()
+        camp = Campaign.objects.create(
+            name="Cached",
+            discount_value=Decimal("10"),
+            start_date=today - timedelta(days=1),
+            end_date=today + timedelta(days=1),
+            max_txn_per_customer_per_day=1,
+        )
+        params = {"customer_id": self.customer.id, "subtotal": "100.00", "delivery": "10.00"}
+
+        self.assertEqual(len(self.client.get(self.available_url, params).data["available_campaigns"]), 1)
+        with self.assertNumQueries(1):  # user lookup only
+            res = self.client.get(self.available_url, params)
+        self.assertEqual(len(res.data["available_campaigns"]), 1)
+
+        # redeeming hits the daily limit and must invalidate the cached response
+        self.client_admin.post(
+            self.redeem_url,
+            {"campaign_id": camp.id, **params},
             format="json",
         )
-        self.assertEqual(patch_res.status_code, 200)
-        self.assertEqual(patch_res.data["is_active"], False)
+        self.assertEqual(self.client.get(self.available_url, params).data["available_campaigns"], [])
 
-        del_res = self.client_admin.delete(
-            reverse("campaign-detail", args=[camp_id])
+    def test_redeem_unknown_customer_or_campaign_returns_404(self):
+        create_res = self.client_admin.post(self.list_url, self.campaign_payload, format="json")
+        body = {"customer_id": self.customer.id, "subtotal": "100.00", "delivery": "10.00"}
+
+        res = self.client_admin.post(
+            self.redeem_url, {**body, "campaign_id": create_res.data["id"] + 1000}, format="json"
+        )
+        self.assertEqual(res.status_code, 404)
+        res = self.client_admin.post(
+            self.redeem_url,
+            {**body, "campaign_id": create_res.data["id"], "customer_id": 999999},
+            format="json",
         )
-        self.assertIn(del_res.status_code, (200, 204))
\ No newline at end of file
+        self.assertEqual(res.status_code, 404)
+
+
+class ORJSONRendererTests(SimpleTestCase):
+    """ORJSONRenderer must produce the same bytes as DRF's JSONRenderer."""
+
+    def assertSameBytes(self, data, accepted_media_type=None, renderer_context=None):
+        self.assertEqual(
+            ORJSONRenderer().render(data, accepted_media_type, renderer_context),
+            JSONRenderer().render(data, accepted_media_type, renderer_context),
+        )
+
+    def test_matches_json_renderer(self):
+        self.assertSameBytes({
+            "decimal": Decimal("12.50"),
+            "datetime": datetime(2024, 1, 2, 3, 4, 5, 678901, tzinfo=dt_timezone.utc),
+            "date": date(2024, 1, 2),
+            "time": time(3, 4, 5, 678901),
+            "uuid": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+            1: "int key",
+            "lazy": gettext_lazy("lazy string"),
+            "unicode": "caf\u00e9 \u2028 \u2029",
+            "nested": [None, True, 1.5, {"k": []}],
+        })
+
+    def test_falls_back_for_indent_and_wide_ints(self):
+        data = {"a": [1, 2], "big": 2 ** 70}
+        self.assertSameBytes(data)
+        self.assertSameBytes(data, "application/json; indent=2")
+        self.assertSameBytes(data, renderer_context={"indent": 4})
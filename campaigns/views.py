@@ -2,24 +2,65 @@ from __future__ import annotations
 
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
+from rest_framework.pagination import CursorPagination
 from rest_framework.response import Response
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Exists
+from django.http import Http404, JsonResponse
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiTypes
 
+from .cache import AVAILABLE_CACHE_TIMEOUT, active_campaign_count, campaign_epoch
 from .models import Campaign
-from .serializers import CampaignSerializer, CartCheckSerializer, RedeemSerializer
-from .services import Cart, preview_discount, redeem_discount
+from .serializers import (
+    AvailableCampaignSerializer,
+    CampaignSerializer,
+    CartCheckSerializer,
+    RedeemSerializer,
+)
+from .services import (
+    PREVIEW_FIELDS,
+    Cart,
+    preview_discounts_bulk,
+    redeem_discount,
+    with_remaining_budget,
+)
 
 User = get_user_model()
 
+_SAFE_METHODS = frozenset(permissions.SAFE_METHODS)
+
+# columns returned by /campaigns/summary/
+SUMMARY_FIELDS = (
+    "id",
+    "name",
+    "applies_to",
+    "discount_type",
+    "discount_value",
+    "max_discount_amount",
+    "start_date",
+    "end_date",
+    "is_active",
+    "total_budget_limit",
+)
+
 
 class IsAdminOrReadOnly(permissions.BasePermission):
     """Allow read-only for everyone, write for staff."""
     def has_permission(self, request, view):
-        if request.method in permissions.SAFE_METHODS:
+        if request.method in _SAFE_METHODS:
             return True
-        return bool(request.user and request.user.is_staff)
+        user = request.user
+        return bool(user and user.is_staff)
+
+
+class CampaignCursorPagination(CursorPagination):
+    """Keyset pages over -created_at: no OFFSET scan and no COUNT(*) query."""
+    ordering = "-created_at"
+    page_size = 50
 
 
 @extend_schema(tags=["Campaigns"])
@@ -28,37 +69,39 @@ class CampaignViewSet(viewsets.ModelViewSet):
     CRUD + functional endpoints for managing discount campaigns.
     Includes:
     - /campaigns/available/ → check eligible discounts for cart
+    - /campaigns/summary/ → lightweight list of all campaigns
     - /campaigns/redeem/ → apply a discount and update usage/budget
     """
     queryset = Campaign.objects.all().order_by("-created_at")
     serializer_class = CampaignSerializer
     permission_classes = [IsAdminOrReadOnly]
-
+    pagination_class = CampaignCursorPagination
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        if self.action in ("list", "retrieve"):
+            qs = with_remaining_budget(qs)
+        elif self.action == "destroy":
+            # delete only needs the primary key to cascade
+            qs = qs.only("id")
+        return qs
+
+    @staticmethod
+    def _existing_user_id(pk):
+        """Return pk if such a user exists (without loading the row), else 404."""
+        user_id = User.objects.filter(pk=pk).values_list("pk", flat=True).first()
+        if user_id is None:
+            raise Http404("No user matches the given query.")
+        return user_id
 
     def _collect_cart(self, request):
-        """Read cart parameters from GET query or POST body."""
-        if request.method == "GET":
-            try:
-                customer_id = int(request.query_params.get("customer_id"))
-                subtotal = request.query_params.get("subtotal")
-                delivery = request.query_params.get("delivery")
-                if not (customer_id and subtotal and delivery):
-                    raise ValueError
-            except Exception:
-                return None, Response(
-                    {"detail": "Provide customer_id, subtotal, and delivery as query params."},
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
-            user = get_object_or_404(User, pk=customer_id)
-            return Cart(user, subtotal, delivery), None
-
-        payload = CartCheckSerializer(data=request.data)
+        """Validate cart parameters from the GET query or the POST body and build a Cart."""
+        data = request.query_params if request.method == "GET" else request.data
+        payload = CartCheckSerializer(data=data)
         payload.is_valid(raise_exception=True)
         d = payload.validated_data
 
-        user = get_object_or_404(User, pk=d["customer_id"])
-
-        return Cart(user, d["subtotal"], d["delivery"]), None
+        return Cart(self._existing_user_id(d["customer_id"]), d["subtotal"], d["delivery"])
 
     @extend_schema(
         parameters=[
@@ -72,29 +115,44 @@ class CampaignViewSet(viewsets.ModelViewSet):
     )
     @action(detail=False, methods=["get", "post"], url_path="available")
     def available(self, request):
-        cart, error = self._collect_cart(request)
-        if error:
-            return error
-
-        applicable = []
-        for c in self.get_queryset().filter(is_active=True):
-            prev = preview_discount(c, cart)
-            if prev.get("applicable"):
-                applicable.append({
-                    "campaign_id": c.id,
-                    "campaign_name": c.name,
-                    "applies_to": prev["applies_to"],
-                    "discount_amount": str(prev["discount_amount"]),
-                    "discount_type": c.discount_type,
-                    "discount_value": str(c.discount_value),
-                })
+        cart = self._collect_cart(request)
+        if active_campaign_count() == 0:
+            return Response({"available_campaigns": []}, status=status.HTTP_200_OK)
+
+        today = timezone.localdate()
+
+        def compute():
+            # plain manager: no ordering/annotations; the service narrows to the
+            # active date window (camp_active_window index) and loads PREVIEW_FIELDS only
+            campaigns = [c for c, _ in preview_discounts_bulk(Campaign.objects.all(), cart, today=today)]
+            return AvailableCampaignSerializer(campaigns, many=True).data
+
+        # keyed by cart shape and campaign data version (bumped by signals/redeem)
+        key = f"avail:{cart.customer_id}:{cart.subtotal}:{cart.delivery}:{today}:{campaign_epoch()}"
+        applicable = cache.get_or_set(key, compute, timeout=AVAILABLE_CACHE_TIMEOUT)
 
         return Response({"available_campaigns": applicable}, status=status.HTTP_200_OK)
 
+    @extend_schema(
+        responses={200: OpenApiTypes.OBJECT},
+        description="Lightweight campaign list (selected columns + remaining budget), built from values() without the model serializer.",
+    )
+    @action(detail=False, methods=["get"], url_path="summary")
+    def summary(self, request):
+        rows = list(
+            Campaign.objects.order_by("-created_at")
+            .values(*SUMMARY_FIELDS, "budget__total_discount_given")
+        )
+        for row in rows:
+            used = row.pop("budget__total_discount_given")
+            limit = row["total_budget_limit"]
+            row["remaining_budget"] = None if limit is None else limit - (used or 0)
+        return JsonResponse({"results": rows}, encoder=DjangoJSONEncoder)
+
     @extend_schema(
         request=RedeemSerializer,
         responses={200: OpenApiTypes.OBJECT, 400: OpenApiTypes.OBJECT},
-        description="Redeem a campaign discount (auth required). Atomic update of daily usage and budget with row locks.",
+        description="Redeem a campaign discount (auth required). Atomic update of daily usage and budget via conditional UPDATEs.",
     )
     @action(detail=False, methods=["post"], url_path="redeem")
     def redeem(self, request):
@@ -102,14 +160,23 @@ class CampaignViewSet(viewsets.ModelViewSet):
         payload.is_valid(raise_exception=True)
         d = payload.validated_data
 
-        user = get_object_or_404(User, pk=d["customer_id"])
-
-        campaign = get_object_or_404(Campaign, pk=d["campaign_id"])
-        cart = Cart(user, d["subtotal"], d["delivery"])
-
-        result = redeem_discount(campaign, cart)
-        if "discount_amount" in result:
-            result["discount_amount"] = str(result["discount_amount"])
-
-        code = status.HTTP_200_OK if result.get("applicable") else status.HTTP_400_BAD_REQUEST
-        return Response(result, status=code)
+        # campaign + customer existence check in one query
+        campaign = get_object_or_404(
+            Campaign.objects.select_related("budget")
+            .only(*PREVIEW_FIELDS, "budget__total_discount_given")
+            .annotate(customer_exists=Exists(User.objects.filter(pk=d["customer_id"]))),
+            pk=d["campaign_id"],
+        )
+        if not campaign.customer_exists:
+            raise Http404("No user matches the given query.")
+        cart = Cart(d["customer_id"], d["subtotal"], d["delivery"])
+
+        # same calendar day /available/ uses (TIME_ZONE, not the server clock)
+        result = redeem_discount(campaign, cart, today=timezone.localdate())
+        data = result._asdict()
+        data["discount_amount"] = str(result.discount_amount)
+        if result.reason is None:
+            del data["reason"]
+
+        code = status.HTTP_200_OK if result.applicable else status.HTTP_400_BAD_REQUEST
+        return Response(data, status=code)